@@ -1,10 +1,15 @@
 import os
-import pandas as pd
+import json
+import hashlib
+import threading
 import numpy as np
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Input
 from sklearn.preprocessing import MinMaxScaler
 
+from agents.demand_model_store import DemandModelStore, shard_path
+from storage.table_store import read_table, table_columns, source_signature
+
 # -----------------------------
 # Paths
 # -----------------------------
@@ -12,19 +17,105 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, "data", "sales.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "model")
 MODEL_PATH = os.path.join(MODEL_DIR, "demand_model.keras")
+PRODUCT_MODEL_DIR = os.path.join(MODEL_DIR, "demand")
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# How many per-product forecasters stay loaded at once
+MODEL_CACHE_SIZE = int(os.getenv("DEMAND_MODEL_CACHE_SIZE", "32"))
+
 FEATURES = ["sales", "price", "holiday", "promotion", "temperature", "fuel_price"]
 
 
 # -----------------------------
 # Load Data
 # -----------------------------
-def load_data():
+# Products with their own rows in sales.csv, re-read only when it changes
+_sales_products = {"signature": None, "products": set()}
+_sales_products_lock = threading.Lock()
+
+
+def keyed_products():
+    signature = source_signature("sales")
+
+    with _sales_products_lock:
+        if _sales_products["signature"] != signature:
+            products = set()
+            if "product" in table_columns("sales"):
+                products = set(read_table("sales", ["product"])["product"].astype(str).str.lower())
+            _sales_products["products"] = products
+            _sales_products["signature"] = signature
+
+        return _sales_products["products"]
+
+
+def sales_product(product=None):
+    """The product itself when sales.csv has rows for it, otherwise None —
+    products without their own history share the default model"""
+    if product and product.lower() in keyed_products():
+        return product
+    return None
+
+
+def pooled_history(df):
+    """One row per week averaged over every product, so the shared model's
+    5-week windows don't interleave different products' rows"""
+    period = df["week"] if "week" in df.columns else df.groupby("product").cumcount()
+    return df.groupby(period.values)[FEATURES].mean().reset_index(drop=True)
+
+
+def load_data(product=None):
+    """Sales history for a product, and whether it was filtered down to
+    that product's own rows"""
     if not os.path.exists(DATA_PATH):
         raise FileNotFoundError("sales.csv not found in data folder.")
-    return pd.read_csv(DATA_PATH)
+
+    # Sales history is keyed by product when the file has a product column,
+    # otherwise every product shares the same history
+    columns = table_columns("sales")
+    if "product" not in columns:
+        return read_table("sales", FEATURES), False
+
+    df = read_table("sales", FEATURES + ["product"] + (["week"] if "week" in columns else []))
+
+    if product:
+        product_df = df[df["product"].astype(str).str.lower() == product.lower()]
+        if not product_df.empty:
+            return product_df.reset_index(drop=True), True
+        print(f"No sales history for '{product}', using all products")
+
+    return pooled_history(df), False
+
+
+def model_path_for(product=None):
+    if not product:
+        return MODEL_PATH
+    return shard_path(PRODUCT_MODEL_DIR, product)
+
+
+def history_path_for(model_path):
+    """Sidecar recording the sales history a model was trained on"""
+    return os.path.splitext(model_path)[0] + ".json"
+
+
+def history_signature(df):
+    return {
+        "rows": len(df),
+        "digest": hashlib.md5(df[FEATURES].to_csv(index=False).encode("utf-8")).hexdigest()
+    }
+
+
+def load_history(model_path):
+    try:
+        with open(history_path_for(model_path), "r") as f:
+            return json.load(f)
+    except:
+        return None
+
+
+def save_history(model_path, signature):
+    with open(history_path_for(model_path), "w") as f:
+        json.dump(signature, f, indent=2)
 
 
 # -----------------------------
@@ -68,29 +159,47 @@ def build_model(input_shape):
 # -----------------------------
 # Load or Train Model
 # -----------------------------
-def load_or_train():
+def load_or_train(product=None):
 
-    df = load_data()
+    df, filtered = load_data(product)
     X, y, scaler = prepare_data(df)
 
-    if os.path.exists(MODEL_PATH):
-        print("Loading saved model...")
-        model = load_model(MODEL_PATH, compile=False)
+    # Only a product with its own sales rows gets its own model
+    product = product if filtered else None
+    model_path = model_path_for(product)
+
+    signature = history_signature(df)
+    trained_on = load_history(model_path)
+
+    if os.path.exists(model_path) and trained_on in (None, signature):
+        print(f"Loading saved model for {product or 'default'}...")
+        model = load_model(model_path, compile=False)
+        # Saved before histories were recorded — adopt the current one
+        if trained_on is None:
+            save_history(model_path, signature)
     else:
-        print("Training new model...")
+        if os.path.exists(model_path):
+            print(f"Sales history changed, retraining model for {product or 'default'}...")
+        else:
+            print(f"Training new model for {product or 'default'}...")
         model = build_model((X.shape[1], X.shape[2]))
         model.fit(X, y, epochs=30, verbose=0)
-        model.save(MODEL_PATH)
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        model.save(model_path)
+        save_history(model_path, signature)
 
     return model, scaler, df
 
 
+# Only the hot products stay resident, the rest are reloaded from disk
+# Products without their own sales history all share the default entry
+model_store = DemandModelStore(load_or_train, capacity=MODEL_CACHE_SIZE, resolve=sales_product)
+
+
 # -----------------------------
 # Predict Next Demand
 # -----------------------------
-def predict_demand_lstm():
-
-    model, scaler, df = load_or_train()
+def forecast(model, scaler, df):
 
     last_window = df[FEATURES].tail(5).values
 
@@ -105,8 +214,41 @@ def predict_demand_lstm():
 
     prediction = scaler.inverse_transform(dummy)[0, 0]
 
-    prediction = max(0, int(prediction))
+    return max(0, int(prediction))
+
+
+def predict_demand_lstm(product=None):
 
-    print("Predicted Demand:", prediction)
+    prediction = forecast(*model_store.get(product))
 
-    return prediction
\ No newline at end of file
+    print(f"Predicted Demand for {product or 'default'}:", prediction)
+
+    return prediction
+
+# -----------------------------
+# Predict Demand for Many Requests
+# -----------------------------
+def predict_demands(products):
+    """Forecasts for a batch of products with one model.predict call per
+    model. Products served by the same model share its history, and so
+    its forecast. A product whose model can't be loaded gets the exception
+    in its place, without failing the rest of the batch."""
+
+    groups = {}
+    for i, product in enumerate(products):
+        groups.setdefault(model_store.key_for(product), []).append(i)
+
+    results = [None] * len(products)
+
+    for key, indices in groups.items():
+        try:
+            prediction = forecast(*model_store.get(products[indices[0]]))
+            print(f"Predicted Demand for {key or 'default'} "
+                  f"({len(indices)} request(s)):", prediction)
+        except Exception as e:
+            prediction = e
+
+        for i in indices:
+            results[i] = prediction
+
+    return results
@@ -0,0 +1,128 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# -----------------------------
+# On-disk Layout
+# -----------------------------
+def product_slug(product):
+    """Filesystem-safe key for a product name"""
+    slug = re.sub(r"[^a-z0-9]+", "_", str(product).strip().lower()).strip("_")
+    return slug or "product"
+
+
+def shard_path(model_dir, product, extension=".keras"):
+    """Path of a product's model, sharded by a short hash prefix so a
+    catalogue of thousands of SKUs doesn't end up in one directory"""
+    slug = product_slug(product)
+    shard = hashlib.md5(slug.encode("utf-8")).hexdigest()[:2]
+    return os.path.join(model_dir, shard, slug + extension)
+
+
+# -----------------------------
+# LRU Model Store
+# -----------------------------
+class DemandModelStore:
+    """Keeps the most recently used per-product forecasters in memory.
+
+    `loader(product)` loads (or trains) a product's forecaster from disk and
+    returns whatever the caller needs to predict with. Only `capacity`
+    products stay resident; the least recently used one is dropped when a
+    new product is loaded and can be reloaded from disk later.
+
+    `resolve(product)`, if given, maps a requested product to the product
+    whose forecaster serves it — None for the shared default forecaster.
+
+    Loading happens outside the store's lock, so a cold product being
+    loaded or trained never blocks hits on resident ones; concurrent
+    requests for the same cold product share one load.
+    """
+
+    def __init__(self, loader, capacity=32, resolve=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.loader = loader
+        self.capacity = capacity
+        self.resolve = resolve
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve(self, product):
+        if product and self.resolve is not None:
+            product = self.resolve(product)
+        return product, (product_slug(product) if product else None)
+
+    def key_for(self, product=None):
+        """Key of the forecaster that serves a product"""
+        return self._resolve(product)[1]
+
+    def get(self, product=None):
+        product, key = self._resolve(product)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = Future()
+                self.misses += 1
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return loading.result()
+
+        try:
+            entry = self.loader(product)
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set_exception(e)
+            raise
+
+        with self._lock:
+            self._loading.pop(key, None)
+            self._entries[key] = entry
+
+            while len(self._entries) > self.capacity:
+                evicted, _ = self._entries.popitem(last=False)
+                print(f"Evicted demand model: {evicted or 'default'}")
+
+        loading.set_result(entry)
+        return entry
+
+    def evict(self, product=None):
+        """Drop a product's forecaster, e.g. after its sales history changed"""
+        return self.evict_key(self.key_for(product))
+
+    def evict_key(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resident(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "resident": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,274 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+from storage.table_store import read_table, source_signature
+from agents.supplier_index import get_supplier_index, normalize
+from agents.feedback_agent import DELAY_TOLERANCE_DAYS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(BASE_DIR, "data", "feature_store.json")
+
+# Rolling window of performance records kept per supplier / product
+WINDOW = 20
+
+# Records needed before rolling features replace a static column
+MIN_RECORDS = 5
+
+
+def empty_state():
+    return {
+        "performance_rows": 0,
+        "performance_digest": rows_digest(None),
+        "suppliers": {},
+        "products": {},
+        "supplier_features": {},
+        "product_features": {}
+    }
+
+
+def rows_digest(records):
+    """Digest of the performance records ingested so far"""
+    digest = hashlib.md5()
+    if records is not None and len(records):
+        digest.update(pd.util.hash_pandas_object(records, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def window_features(window):
+    """Rolling features of one supplier's or product's recent deliveries"""
+    delays = np.asarray(window["delays"], dtype=float)
+    quality = np.asarray(window["quality"], dtype=float)
+    lead_times = np.asarray(window["lead_times"], dtype=float)
+
+    return {
+        "records": len(delays),
+        "delayed_deliveries": int((delays > DELAY_TOLERANCE_DAYS).sum()),
+        "delay_rate": float((delays > DELAY_TOLERANCE_DAYS).mean()),
+        "mean_delay": float(delays.mean()),
+        "quality_issue_rate": float(quality.mean()),
+        "lead_time_p50": float(np.percentile(lead_times, 50)),
+        "lead_time_p90": float(np.percentile(lead_times, 90))
+    }
+
+
+def training_ranges(table, columns):
+    """(min, max) of each column in a model's training data"""
+    train = read_table(table, columns)
+    return {column: (float(train[column].min()), float(train[column].max())) for column in columns}
+
+
+def delay_count(rolling, delay_range):
+    """Delay rate as a delay count on the training data's scale — the
+    training columns count past delays from 0 up to a small maximum"""
+    low, high = delay_range
+    return float(round(low + rolling["delay_rate"] * (high - low)))
+
+
+class FeatureStore:
+    """Rolling supplier and product features kept up to date from
+    performance.csv.
+
+    Only performance records appended since the last refresh are ingested,
+    and only the suppliers and products they touch are recomputed. The
+    model-ready feature frames are materialized once and reused until
+    performance.csv, suppliers.csv or inventory.csv change.
+    """
+
+    def __init__(self, path=STATE_PATH, window=WINDOW):
+        self.path = path
+        self.window = window
+        self._state = None
+        self._lock = threading.RLock()
+        self._performance_signature = None
+        self._supplier_frame = None
+        self._supplier_source = None
+        self._product_frame = None
+        self._product_source = None
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _load(self):
+        if self._state is not None:
+            return self._state
+
+        self._state = empty_state()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self._state = json.load(f)
+            except:
+                pass
+
+        return self._state
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    # -----------------------------
+    # Incremental Ingestion
+    # -----------------------------
+    def refresh(self):
+        """Ingest the performance records appended since the last refresh"""
+        with self._lock:
+            signature = source_signature("performance")
+            if signature == self._performance_signature:
+                return
+
+            state = self._load()
+            perf = read_table("performance")
+
+            # Records already ingested were edited or removed — start over
+            ingested = perf.iloc[:state["performance_rows"]]
+            if (len(ingested) < state["performance_rows"]
+                    or rows_digest(ingested) != state.get("performance_digest")):
+                self._state = state = empty_state()
+                self._supplier_frame = None
+                self._product_frame = None
+
+            if len(perf) > state["performance_rows"]:
+                self.ingest(perf.iloc[state["performance_rows"]:], digest=rows_digest(perf))
+
+            self._performance_signature = signature
+
+    def ingest(self, records, digest=None):
+        """Add performance records to the rolling windows. `digest` is
+        rows_digest of every record ingested once these are"""
+        with self._lock:
+            state = self._load()
+            index = get_supplier_index()
+            keyed = "product" in records.columns
+
+            touched_suppliers, touched_products = set(), set()
+
+            for row in records.to_dict(orient="records"):
+                supplier = index.resolve(row["supplier"]) or normalize(row["supplier"])
+                self._append(state["suppliers"], supplier, row)
+                touched_suppliers.add(supplier)
+
+                if keyed:
+                    product = str(row["product"]).lower()
+                    self._append(state["products"], product, row)
+                    touched_products.add(product)
+
+            for supplier in touched_suppliers:
+                state["supplier_features"][supplier] = window_features(state["suppliers"][supplier])
+            for product in touched_products:
+                state["product_features"][product] = window_features(state["products"][product])
+
+            state["performance_rows"] += len(records)
+            state["performance_digest"] = digest
+            self._save()
+
+            if touched_suppliers:
+                self._supplier_frame = None
+            if touched_products:
+                self._product_frame = None
+
+    def _append(self, windows, key, row):
+        window = windows.setdefault(key, {"delays": [], "quality": [], "lead_times": []})
+        window["delays"] = (window["delays"] + [int(row["delivery_delay"])])[-self.window:]
+        window["quality"] = (window["quality"] + [int(row["quality_issue"])])[-self.window:]
+        window["lead_times"] = (window["lead_times"] + [int(row["actual_delivery_time"])])[-self.window:]
+
+    # -----------------------------
+    # Materialized Feature Frames
+    # -----------------------------
+    def supplier_features(self):
+        """One row per supplier with the supplier model's features
+        (cost, delivery_time, past_delays, quality_score) plus reliability
+        and the rolling performance features"""
+        with self._lock:
+            self.refresh()
+
+            source = source_signature("suppliers")
+            if self._supplier_frame is None or source != self._supplier_source:
+                self._supplier_frame = self._build_supplier_frame()
+                self._supplier_source = source
+
+            return self._supplier_frame.copy()
+
+    def _build_supplier_frame(self):
+        suppliers = read_table(
+            "suppliers",
+            ["supplier", "cost", "delivery_time", "past_delays", "quality_score", "reliability"]
+        )
+        suppliers["supplier"] = suppliers["supplier"].astype(str)
+        for column in ["cost", "delivery_time", "past_delays"]:
+            suppliers[column] = suppliers[column].astype(float)
+
+        index = get_supplier_index()
+        features = self._load()["supplier_features"]
+        ranges = training_ranges("supplier_training", ["delivery_time", "past_delays", "quality_score"])
+
+        for i, name in suppliers["supplier"].items():
+            rolling = features.get(index.resolve(name) or normalize(name))
+            if not rolling:
+                continue
+
+            for key, value in rolling.items():
+                suppliers.loc[i, key] = value
+
+            if rolling["records"] < MIN_RECORDS:
+                continue
+
+            # Observed behaviour replaces the static columns once there's
+            # enough of it, kept on the scale the supplier model was trained on
+            suppliers.loc[i, "delivery_time"] = np.clip(rolling["lead_time_p50"], *ranges["delivery_time"])
+            suppliers.loc[i, "past_delays"] = delay_count(rolling, ranges["past_delays"])
+            suppliers.loc[i, "quality_score"] = np.clip(
+                suppliers.loc[i, "quality_score"] * (1 - rolling["quality_issue_rate"]),
+                *ranges["quality_score"]
+            )
+
+        return suppliers
+
+    def product_features(self, product=None):
+        """Inventory model features (current_stock, past_delay, holding_cost,
+        lead_time) for a product — the first product if it isn't found"""
+        with self._lock:
+            self.refresh()
+
+            source = source_signature("inventory")
+            if self._product_frame is None or source != self._product_source:
+                self._product_frame = self._build_product_frame()
+                self._product_source = source
+
+            frame = self._product_frame
+
+            if product and product.lower() in frame.index:
+                print(f"Using inventory data for: {product}")
+                return frame.loc[product.lower()].tolist()
+
+            if product:
+                print(f"Product '{product}' not found, using default")
+            return frame.iloc[0].tolist()
+
+    def _build_product_frame(self):
+        current = read_table(
+            "inventory",
+            ["product", "current_stock", "past_delay", "holding_cost", "lead_time"]
+        )
+        current.index = current["product"].astype(str).str.lower()
+        current = current.drop(columns="product").astype(float)
+
+        # Only performance files with a product column carry product
+        # level delivery history; otherwise inventory.csv values stand
+        ranges = training_ranges("inventory_training", ["past_delay", "lead_time"])
+
+        for product, rolling in self._load()["product_features"].items():
+            if product in current.index and rolling["records"] >= MIN_RECORDS:
+                current.loc[product, "past_delay"] = delay_count(rolling, ranges["past_delay"])
+                current.loc[product, "lead_time"] = np.clip(rolling["lead_time_p50"], *ranges["lead_time"])
+
+        return current
+
+
+feature_store = FeatureStore()
@@ -1,42 +1,53 @@
 import os
 import pandas as pd
-from difflib import get_close_matches
+
+from storage.table_store import read_table
+from agents.supplier_index import get_supplier_index, normalize
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-PERFORMANCE_PATH = os.path.join(BASE_DIR, "data", "performance.csv")
 SUPPLIER_PATH = os.path.join(BASE_DIR, "data", "suppliers.csv")
 
+# A delivery counts as delayed when it's more than this many days late
+DELAY_TOLERANCE_DAYS = 1
 
-def update_reliability(selected_supplier):
 
-    perf = pd.read_csv(PERFORMANCE_PATH)
-    suppliers = pd.read_csv(SUPPLIER_PATH)
+def reward_for(delay, quality_issue):
 
-    # -----------------------------
-    # 🔥 Normalize supplier names
-    # -----------------------------
-    suppliers["supplier"] = suppliers["supplier"].astype(str).str.strip().str.lower()
-    perf["supplier"] = perf["supplier"].astype(str).str.strip().str.lower()
+    reward = 1
+
+    if delay > DELAY_TOLERANCE_DAYS:
+        reward -= 0.5
+
+    if quality_issue == 1:
+        reward -= 0.5
+
+    return reward
+
+
+def apply_performance(perf, suppliers=None):
+    """Add the reliability reward of each performance record to its
+    supplier and save suppliers.csv"""
+
+    if suppliers is None:
+        suppliers = pd.read_csv(SUPPLIER_PATH)
+        suppliers["supplier"] = suppliers["supplier"].map(normalize)
 
-    selected_supplier = str(selected_supplier).strip().lower()
+    # Performance records spell names differently ('SupplierA'), so each
+    # distinct name is resolved once through the shared index
+    index = get_supplier_index()
+    resolved = {name: index.resolve(name) for name in perf["supplier"].unique()}
 
     # -----------------------------
     # 🔥 Update reliability scores
     # -----------------------------
     for _, row in perf.iterrows():
 
-        supplier = row["supplier"]
-        delay = row["delivery_delay"]
-        quality_issue = row["quality_issue"]
+        supplier = resolved[row["supplier"]]
+        if supplier is None:
+            continue
 
-        reward = 1
-
-        if delay > 1:
-            reward -= 0.5
-
-        if quality_issue == 1:
-            reward -= 0.5
+        reward = reward_for(row["delivery_delay"], row["quality_issue"])
 
         suppliers.loc[
             suppliers["supplier"] == supplier,
@@ -48,25 +59,26 @@ def update_reliability(selected_supplier):
 
     suppliers.to_csv(SUPPLIER_PATH, index=False)
 
+    return suppliers
+
+
+def update_reliability(selected_supplier):
+
+    perf = read_table("performance", ["supplier", "delivery_delay", "quality_issue"])
+    suppliers = apply_performance(perf)
+
     # -----------------------------
-    # 🔥 Safe retrieval of selected supplier
+    # 🔥 Resolve exact, alias or misspelled supplier name
     # -----------------------------
+    supplier = get_supplier_index().resolve(selected_supplier)
+
     filtered = suppliers.loc[
-        suppliers["supplier"] == selected_supplier,
+        suppliers["supplier"] == supplier,
         "reliability"
     ]
 
-    # If exact match not found → try fuzzy match
-    if filtered.empty:
-        match = get_close_matches(selected_supplier, suppliers["supplier"], n=1)
-        if match:
-            selected_supplier = match[0]
-            filtered = suppliers.loc[
-                suppliers["supplier"] == selected_supplier,
-                "reliability"
-            ]
-        else:
-            print("⚠ Supplier not found:", selected_supplier)
-            return None
-
-    return float(filtered.values[0])
\ No newline at end of file
+    if supplier is None or filtered.empty:
+        print("⚠ Supplier not found:", selected_supplier)
+        return None
+
+    return float(filtered.values[0])
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from storage.table_store import read_table, table_columns
+from agents.supplier_index import get_supplier_index, normalize
+
+N_SCENARIOS = 5000
+
+# Penalty per unit of demand that can't be served
+STOCKOUT_COST = 100.0
+
+# Days of demand covered by the order once it arrives (one sales period)
+REVIEW_DAYS = 7
+
+# Multipliers around the model's reorder quantity, plus the reliability
+# buffers inventory_decision would add
+QUANTITY_MULTIPLIERS = [0.5, 0.75, 1.0, 1.25, 1.5]
+RELIABILITY_BUFFERS = [20, 50]
+
+
+# -----------------------------
+# Scenario Inputs
+# -----------------------------
+def demand_history(product=None):
+    """Weekly sales for the product (all rows if sales aren't product keyed)"""
+    keyed = "product" in table_columns("sales")
+    sales = read_table("sales", ["sales"] + (["product"] if keyed else []))
+    if product and keyed:
+        product_sales = sales[sales["product"].astype(str).str.lower() == product.lower()]
+        if not product_sales.empty:
+            sales = product_sales
+    return sales["sales"].to_numpy(dtype=float)
+
+
+def product_inventory(product=None):
+    current = read_table("inventory", ["product", "current_stock", "holding_cost"])
+    row = current.iloc[0]
+    if product:
+        product_row = current[current["product"].str.lower() == product.lower()]
+        if not product_row.empty:
+            row = product_row.iloc[0]
+    return float(row["current_stock"]), float(row["holding_cost"])
+
+
+def lead_time_records(supplier_names, delivery_time):
+    """Padded (suppliers x records) matrix of lead times in days.
+
+    Suppliers with performance records use their observed
+    actual_delivery_time. Suppliers without any fall back to their quoted
+    delivery_time plus everyone's observed delivery delays.
+    """
+    perf = read_table("performance", ["supplier", "delivery_delay", "actual_delivery_time"])
+    pooled = perf["delivery_delay"].to_numpy(dtype=float)
+    if len(pooled) == 0:
+        pooled = np.zeros(1)
+
+    # Resolve each distinct performance name once, then map every record
+    # to its supplier's row (-1 for names that match no supplier)
+    index = get_supplier_index()
+    position = {normalize(name): i for i, name in enumerate(supplier_names)}
+    codes = perf["supplier"].astype(str).map(
+        {name: position.get(index.resolve(name), -1) for name in perf["supplier"].astype(str).unique()}
+    ).to_numpy(dtype=int)
+
+    known = codes >= 0
+    codes = codes[known]
+    lead_times = perf["actual_delivery_time"].to_numpy(dtype=float)[known]
+
+    # Group records by supplier with one stable sort; each record's column
+    # is its rank within its supplier
+    order = np.argsort(codes, kind="stable")
+    codes, lead_times = codes[order], lead_times[order]
+    counts = np.bincount(codes, minlength=len(supplier_names))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    columns = np.arange(len(codes)) - starts[codes]
+
+    missing = counts == 0
+    padded = np.zeros((len(supplier_names), max(counts.max(initial=0), len(pooled))))
+    padded[codes, columns] = lead_times
+    padded[missing, :len(pooled)] = np.asarray(delivery_time, dtype=float)[missing, None] + pooled
+    counts[missing] = len(pooled)
+
+    return padded, counts
+
+
+def candidate_quantities(reorder_qty):
+    quantities = {int(round(reorder_qty * m)) for m in QUANTITY_MULTIPLIERS}
+    quantities.update(int(reorder_qty) + b for b in RELIABILITY_BUFFERS)
+    return sorted(q for q in quantities if q >= 0)
+
+
+# -----------------------------
+# Monte Carlo Simulation
+# -----------------------------
+def simulate_options(
+    product=None,
+    quantities=None,
+    reorder_qty=None,
+    predicted_demand=None,
+    n_scenarios=N_SCENARIOS,
+    stockout_cost=STOCKOUT_COST,
+    seed=42
+):
+    """Expected cost and service level of every reorder quantity x supplier.
+
+    Each scenario samples two weeks of demand (bootstrapped from sales
+    history, rescaled to `predicted_demand` when given) and a lead time per
+    supplier (bootstrapped from its actual delivery times in
+    performance.csv). Stock runs down over the lead time, then the order
+    arrives and has to cover the next REVIEW_DAYS. All options share the
+    same scenarios, so differences between them aren't sampling noise.
+    """
+    rng = np.random.default_rng(seed)
+
+    if quantities is None:
+        if reorder_qty is None:
+            raise ValueError("Either quantities or reorder_qty is required.")
+        quantities = candidate_quantities(reorder_qty)
+
+    history = demand_history(product)
+    if predicted_demand:
+        history = history * (predicted_demand / history.mean())
+
+    stock, holding_cost = product_inventory(product)
+
+    suppliers = read_table("suppliers", ["supplier", "cost", "delivery_time"])
+    names = suppliers["supplier"].tolist()
+    unit_cost = suppliers["cost"].to_numpy(dtype=float)[None, :, None]
+
+    # Shapes: quantities (q, 1, 1), suppliers (1, s, 1), scenarios (1, 1, n)
+    q = np.asarray(quantities, dtype=float)[:, None, None]
+
+    weekly = rng.choice(history, size=(2, n_scenarios))
+    lead_weekly = weekly[0][None, None, :]
+    review_weekly = weekly[1][None, None, :]
+
+    padded, counts = lead_time_records(names, suppliers["delivery_time"].to_numpy(dtype=float))
+    picks = (rng.random((len(names), n_scenarios)) * counts[:, None]).astype(int)
+    lead_days = padded[np.arange(len(names))[:, None], picks][None, :, :]
+
+    # Before the order arrives
+    lead_demand = lead_weekly * lead_days / 7
+    lead_short = np.maximum(lead_demand - stock, 0)
+    on_arrival = np.maximum(stock - lead_demand, 0)
+
+    # After the order arrives
+    review_demand = review_weekly * REVIEW_DAYS / 7
+    available = on_arrival + q
+    review_short = np.maximum(review_demand - available, 0)
+    remaining = np.maximum(available - review_demand, 0)
+
+    # Holding cost is per unit per week on the average stock of each phase
+    holding = holding_cost * (
+        (stock + on_arrival) / 2 * lead_days / 7
+        + (available + remaining) / 2 * REVIEW_DAYS / 7
+    )
+    short = lead_short + review_short
+    cost = q * unit_cost + holding + short * stockout_cost
+
+    total_demand = lead_demand + review_demand
+    fill_rate = 1 - short / np.maximum(total_demand, 1e-9)
+
+    results = pd.DataFrame({
+        "reorder_qty": np.repeat(np.asarray(quantities, dtype=int), len(names)),
+        "supplier": np.tile(names, len(quantities)),
+        "expected_cost": cost.mean(axis=2).ravel(),
+        "cost_p95": np.percentile(cost, 95, axis=2).ravel(),
+        "service_level": (short == 0).mean(axis=2).ravel(),
+        "fill_rate": fill_rate.mean(axis=2).ravel()
+    })
+
+    return results.sort_values("expected_cost").reset_index(drop=True)
+
+
+def simulate_decision(product=None, reorder_qty=None, predicted_demand=None, top=5):
+    """Summary of the simulated decision grid for the LLM"""
+
+    if reorder_qty is None:
+        return {"error": "reorder_qty is required — call calculate_reorder first."}
+
+    results = simulate_options(
+        product=product,
+        reorder_qty=reorder_qty,
+        predicted_demand=predicted_demand
+    )
+
+    best = results.iloc[0]
+    print(f"Simulated {len(results)} options for {product or 'default'} — "
+          f"best: {best['reorder_qty']} units from {best['supplier']}")
+
+    options = results.head(top).round(3).to_dict(orient="records")
+    for option in options:
+        option["reorder_qty"] = int(option["reorder_qty"])
+
+    return {
+        "scenarios": N_SCENARIOS,
+        "options_evaluated": len(results),
+        "best_option": options[0],
+        "top_options": options
+    }
@@ -1,54 +1,88 @@
-import os
-import pandas as pd
+import threading
 from sklearn.ensemble import RandomForestClassifier
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from storage.table_store import read_table
+from agents.supplier_index import get_supplier_index
+from agents.feature_store import feature_store
 
-TRAIN_PATH = os.path.join(BASE_DIR, "data", "supplier_training.csv")
-SUPPLIER_PATH = os.path.join(BASE_DIR, "data", "suppliers.csv")
+FEATURES = [
+    "cost",
+    "delivery_time",
+    "past_delays",
+    "quality_score"
+]
 
+# Trained once per process and reused by every selection
+_model = None
+_model_lock = threading.Lock()
 
-def select_supplier(reorder):
 
-    train = pd.read_csv(TRAIN_PATH)
+def get_model():
+
+    global _model
+
+    with _model_lock:
+        if _model is None:
+            train = read_table("supplier_training", FEATURES + ["on_time_delivery"])
+
+            X = train[FEATURES]
+            y = train["on_time_delivery"]
+
+            _model = RandomForestClassifier(random_state=42)
+            _model.fit(X, y)
 
-    X = train[[
-        "cost",
-        "delivery_time",
-        "past_delays",
-        "quality_score"
-    ]]
+    return _model
 
-    y = train["on_time_delivery"]
 
-    model = RandomForestClassifier(random_state=42)
-    model.fit(X, y)
+def score_suppliers():
 
-    suppliers = pd.read_csv(SUPPLIER_PATH)
+    # Precomputed vectors with delivery_time, past_delays and quality_score
+    # taken from recent performance records
+    suppliers = feature_store.supplier_features()
 
-    suppliers["predicted_score"] = model.predict_proba(
-        suppliers[[
-            "cost",
-            "delivery_time",
-            "past_delays",
-            "quality_score"
-        ]]
+    suppliers["predicted_score"] = get_model().predict_proba(
+        suppliers[FEATURES]
     )[:, 1]
 
+    return suppliers
+
+
+def rank_suppliers(suppliers, reorder):
+
     # Adjust selection logic based on reorder quantity
     if reorder > 300:
-        suppliers = suppliers.sort_values(
+        return suppliers.sort_values(
             by="predicted_score",
             ascending=False
         )
-    else:
-        suppliers = suppliers.sort_values(
-            by=["predicted_score", "cost"],
-            ascending=[False, True]
-        )
 
-    best = suppliers.iloc[0]
+    return suppliers.sort_values(
+        by=["predicted_score", "cost"],
+        ascending=[False, True]
+    )
+
+
+def select_suppliers(reorders):
+    """Supplier selection for many reorder quantities, scoring the
+    suppliers only once"""
+
+    scored = score_suppliers()
+    index = get_supplier_index()
+
+    results = []
+
+    for reorder in reorders:
+        suppliers = rank_suppliers(scored, reorder)
+        best = suppliers.iloc[0]
+
+        # Always hand back the canonical name the other agents resolve to
+        name = index.resolve(best["supplier"]) or best["supplier"]
+        results.append((name, float(best["reliability"]), suppliers))
+
+    return results
+
+
+def select_supplier(reorder):
 
     # ✅ Return supplier name, reliability float, AND full dataframe
-    reliability = float(best["reliability"])
-    return best["supplier"], reliability, suppliers
\ No newline at end of file
+    return select_suppliers([reorder])[0]
@@ -0,0 +1,162 @@
+import os
+import re
+import threading
+from collections import defaultdict, Counter
+
+from storage.table_store import read_table
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUPPLIER_PATH = os.path.join(BASE_DIR, "data", "suppliers.csv")
+
+# Minimum trigram (Dice) similarity for a fuzzy match
+FUZZY_CUTOFF = 0.6
+
+
+def normalize(name):
+    """Canonical form used in suppliers.csv: 'Supplier  A ' -> 'supplier a'"""
+    return " ".join(str(name).lower().split())
+
+
+def compact_key(name):
+    """Spacing and punctuation free key: 'SupplierA', 'supplier-a' -> 'suppliera'"""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def trigrams(key):
+    padded = f"${key}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class SupplierIndex:
+    """Resolves exact, alias and misspelled supplier names to the canonical
+    name in suppliers.csv.
+
+    Exact and alias lookups are dict hits. Fuzzy lookups only score the
+    suppliers that share a trigram with the query (via an inverted index)
+    instead of comparing against every supplier. Resolved queries are
+    remembered as aliases, so each distinct spelling is matched once.
+    """
+
+    def __init__(self, names=()):
+        self.names = set()
+        self.aliases = {}
+        self.keys = {}
+        self.grams = defaultdict(set)
+        self.gram_counts = {}
+        self._lock = threading.RLock()
+
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        canonical = normalize(name)
+
+        with self._lock:
+            if canonical in self.names:
+                return canonical
+
+            self.names.add(canonical)
+            self.aliases[canonical] = canonical
+
+            key = compact_key(canonical)
+            self.keys[key] = canonical
+            grams = trigrams(key)
+            self.gram_counts[canonical] = len(grams)
+            for gram in grams:
+                self.grams[gram].add(canonical)
+
+        return canonical
+
+    def remove(self, name):
+        canonical = normalize(name)
+
+        with self._lock:
+            if canonical not in self.names:
+                return
+
+            self.names.discard(canonical)
+            self.keys.pop(compact_key(canonical), None)
+            self.gram_counts.pop(canonical, None)
+            for gram in trigrams(compact_key(canonical)):
+                self.grams[gram].discard(canonical)
+            self.aliases = {a: c for a, c in self.aliases.items() if c != canonical}
+
+    def add_alias(self, alias, name):
+        with self._lock:
+            self.aliases[normalize(alias)] = self.add(name)
+
+    def resolve(self, name, cutoff=FUZZY_CUTOFF):
+        """Canonical supplier name, or None if nothing is close enough"""
+        if name is None:
+            return None
+
+        query = normalize(name)
+
+        with self._lock:
+            if query in self.aliases:
+                return self.aliases[query]
+
+            key = compact_key(query)
+            match = self.keys.get(key) or self._fuzzy(key, cutoff)
+
+            if match is not None:
+                self.aliases[query] = match
+
+            return match
+
+    def _fuzzy(self, key, cutoff):
+        grams = trigrams(key)
+        if not grams:
+            return None
+
+        shared = Counter()
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] += 1
+
+        scored = sorted(
+            ((2 * count / (len(grams) + self.gram_counts[c]), c) for c, count in shared.items()),
+            reverse=True
+        )
+
+        if not scored or scored[0][0] < cutoff:
+            return None
+
+        # Equally close to two suppliers (e.g. 'SupplierZ') is no match
+        if len(scored) > 1 and scored[1][0] == scored[0][0]:
+            return None
+
+        return scored[0][1]
+
+
+# -----------------------------
+# Shared Index
+# -----------------------------
+_index = SupplierIndex()
+_signature = None
+_refresh_lock = threading.Lock()
+
+
+def get_supplier_index():
+    """The process-wide index, updated incrementally when suppliers.csv changes"""
+    global _signature
+
+    stat = os.stat(SUPPLIER_PATH)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _refresh_lock:
+        if signature != _signature:
+            current = {normalize(n) for n in read_table("suppliers", ["supplier"])["supplier"]}
+
+            for name in current - _index.names:
+                _index.add(name)
+            for name in _index.names - current:
+                _index.remove(name)
+
+            _signature = signature
+
+    return _index
+
+
+def resolve_supplier(name):
+    return get_supplier_index().resolve(name)
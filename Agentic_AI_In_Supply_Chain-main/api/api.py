@@ -1,9 +1,159 @@
 
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
-from agents.advanced_demand_agent import predict_demand_lstm
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from agents.advanced_demand_agent import predict_demand_lstm, predict_demands, model_store
+from agents.inventory_agent import inventory_decisions, get_model as get_inventory_model
+from agents.supplier_agent import select_suppliers, get_model as get_supplier_model
+from agents.feedback_agent import update_reliability
+from agents.simulation_agent import simulate_decision
+from api.batching import MicroBatcher
+
+# Long-lived inference service — run with: uvicorn api.api:app --port 8000
+# Requests arriving within BATCH_WINDOW_MS of each other share one model call
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "64"))
+
+
+def _select(reorders):
+    return [(supplier, reliability) for supplier, reliability, _ in select_suppliers(reorders)]
+
+
+def _update(supplier_names):
+    # Reliability updates rewrite suppliers.csv, so they run one at a time,
+    # and a failed one mustn't make the batcher retry the others
+    results = []
+    for name in supplier_names:
+        try:
+            results.append(update_reliability(name))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+demand_batcher = MicroBatcher(predict_demands, MAX_BATCH_SIZE, BATCH_WINDOW_MS)
+reorder_batcher = MicroBatcher(inventory_decisions, MAX_BATCH_SIZE, BATCH_WINDOW_MS)
+supplier_batcher = MicroBatcher(_select, MAX_BATCH_SIZE, BATCH_WINDOW_MS)
+reliability_batcher = MicroBatcher(_update, MAX_BATCH_SIZE, BATCH_WINDOW_MS)
+
+batchers = {
+    "demand": demand_batcher,
+    "reorder": reorder_batcher,
+    "supplier": supplier_batcher,
+    "reliability": reliability_batcher
+}
+
+
+@asynccontextmanager
+async def lifespan(app):
+
+    # Keep every model warm for the lifetime of the service
+    get_inventory_model()
+    get_supplier_model()
+    model_store.get(None)
+
+    yield
+
+    for batcher in batchers.values():
+        await batcher.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class DemandRequest(BaseModel):
+    product: Optional[str] = None
+
+
+class ReorderRequest(BaseModel):
+    predicted_demand: int
+    supplier_reliability: Optional[float] = None
+    product: Optional[str] = None
+
+
+class SupplierRequest(BaseModel):
+    reorder_qty: int
+
+
+class ReliabilityRequest(BaseModel):
+    supplier_name: str
+
+
+class ToolRequest(BaseModel):
+    args: dict = {}
+    product: Optional[str] = None
 
-app = FastAPI()
 
 @app.get("/predict")
-def predict():
-    return {"demand": predict_demand_lstm()}
+def predict(product: str = None):
+    return {"demand": predict_demand_lstm(product)}
+
+
+@app.post("/demand")
+async def demand(request: DemandRequest):
+    return {"demand": await demand_batcher.submit(request.product)}
+
+
+@app.post("/reorder")
+async def reorder(request: ReorderRequest):
+    decision, reorder_qty = await reorder_batcher.submit(
+        (request.predicted_demand, request.supplier_reliability, request.product)
+    )
+    return {"decision": decision, "reorder_qty": reorder_qty}
+
+
+@app.post("/supplier")
+async def supplier(request: SupplierRequest):
+    name, reliability = await supplier_batcher.submit(request.reorder_qty)
+    return {"supplier": name, "reliability": reliability}
+
+
+@app.post("/reliability")
+async def reliability(request: ReliabilityRequest):
+    return {"updated_reliability": await reliability_batcher.submit(request.supplier_name)}
+
+
+# Same tool names and results as llm_helper.execute_tool
+@app.post("/tools/{tool_name}")
+async def call_tool(tool_name: str, request: ToolRequest):
+
+    args = request.args
+
+    if tool_name == "predict_demand":
+        return await demand(DemandRequest(product=request.product))
+
+    elif tool_name == "calculate_reorder":
+        return await reorder(ReorderRequest(
+            predicted_demand=args.get("predicted_demand"),
+            product=request.product
+        ))
+
+    elif tool_name == "select_best_supplier":
+        return await supplier(SupplierRequest(reorder_qty=args.get("reorder_qty")))
+
+    elif tool_name == "update_supplier_reliability":
+        return await reliability(ReliabilityRequest(supplier_name=args.get("supplier_name")))
+
+    elif tool_name == "simulate_reorder_options":
+        return await run_in_threadpool(
+            simulate_decision,
+            product=request.product,
+            reorder_qty=args.get("reorder_qty"),
+            predicted_demand=args.get("predicted_demand")
+        )
+
+    else:
+        return {"error": f"Unknown tool: {tool_name}"}
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "batching": {name: batcher.stats() for name, batcher in batchers.items()},
+        "demand_models": model_store.stats()
+    }
@@ -0,0 +1,100 @@
+import asyncio
+
+
+class MicroBatcher:
+    """Coalesces concurrent requests into micro-batches.
+
+    Requests submitted within `max_wait_ms` of the first request in a batch
+    (up to `max_batch_size`) are passed together to `handler`, which takes a
+    list of items and returns one result per item. The handler runs in a
+    worker thread so the event loop keeps accepting requests meanwhile.
+
+    A result that is an exception fails only its own request. If the
+    handler raises instead, the batch is retried one item at a time so the
+    error stays with the request that caused it — handlers with side
+    effects should return per-item exceptions rather than raise.
+    """
+
+    def __init__(self, handler, max_batch_size=64, max_wait_ms=10):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item):
+
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+
+            self.batches += 1
+            self.items += len(items)
+            self.largest_batch = max(self.largest_batch, len(items))
+
+            try:
+                results = await loop.run_in_executor(None, self.handler, items)
+            except Exception as e:
+                if len(batch) == 1:
+                    results = [e]
+                else:
+                    results = [await self._run_one(loop, item) for item in items]
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _run_one(self, loop, item):
+        try:
+            return (await loop.run_in_executor(None, self.handler, [item]))[0]
+        except Exception as e:
+            return e
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "queued": self._queue.qsize() if self._queue else 0
+        }
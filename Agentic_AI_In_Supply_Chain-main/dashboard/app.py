@@ -6,11 +6,13 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import json
 
 from llm.llm_helper import run_llm_agent
+from llm.scheduler import INTERACTIVE
+from storage.table_store import read_table
+from agents.supplier_index import resolve_supplier
 
 
 # -----------------------------
@@ -28,12 +30,9 @@ st.write("LLM-driven autonomous supply chain optimization system")
 # -----------------------------
 # LOAD DATA
 # -----------------------------
-sales_path = os.path.join(BASE_DIR, "data", "sales.csv")
-suppliers_path = os.path.join(BASE_DIR, "data", "suppliers.csv")
-inventory_path = os.path.join(BASE_DIR, "data", "inventory.csv")
-sales_df = pd.read_csv(sales_path)
-suppliers_df = pd.read_csv(suppliers_path)
-inventory_df = pd.read_csv(inventory_path)
+sales_df = read_table("sales")
+suppliers_df = read_table("suppliers")
+inventory_df = read_table("inventory")
 
 suppliers_df["supplier"] = suppliers_df["supplier"].str.title()
 
@@ -64,7 +63,7 @@ st.divider()
 if st.button("🚀 Run Agentic AI System"):
 
     with st.spinner(f"🤖 LLM Agent is optimizing supply chain for {selected_product}..."):
-        state, messages = run_llm_agent(product=selected_product)
+        state, messages = run_llm_agent(product=selected_product, priority=INTERACTIVE)
 
     demand = state["demand"]
     reorder = state["reorder"]
@@ -148,8 +147,12 @@ if st.button("🚀 Run Agentic AI System"):
     # -----------------------------
     st.subheader("📈 Demand Forecast Visualization")
 
+    product_sales = sales_df
+    if "product" in sales_df.columns:
+        product_sales = sales_df[sales_df["product"] == selected_product]
+
     fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(sales_df["sales"], marker='o', markersize=3,
+    ax.plot(product_sales["sales"].values, marker='o', markersize=3,
             label="Historical Sales", color="steelblue", linewidth=1.5)
     if demand:
         ax.axhline(y=demand, color='red', linestyle='--',
@@ -169,12 +172,13 @@ if st.button("🚀 Run Agentic AI System"):
     # -----------------------------
     st.subheader("🏭 Supplier Comparison")
 
-    suppliers_df = pd.read_csv(suppliers_path)
+    suppliers_df = read_table("suppliers")
     suppliers_df["supplier"] = suppliers_df["supplier"].str.title()
 
-    colors_cost = ["red" if s.lower() == supplier.lower() else "steelblue"
+    selected = resolve_supplier(supplier)
+    colors_cost = ["red" if resolve_supplier(s) == selected else "steelblue"
                    for s in suppliers_df["supplier"]]
-    colors_rel = ["red" if s.lower() == supplier.lower() else "green"
+    colors_rel = ["red" if resolve_supplier(s) == selected else "green"
                   for s in suppliers_df["supplier"]]
 
     fig2, axes = plt.subplots(1, 2, figsize=(14, 5))
@@ -1,5 +1,6 @@
 import os
 import json
+import requests
 from groq import Groq
 from dotenv import load_dotenv
 
@@ -11,12 +12,25 @@ from agents.advanced_demand_agent import predict_demand_lstm
 from agents.inventory_agent import inventory_decision
 from agents.supplier_agent import select_supplier
 from agents.feedback_agent import update_reliability
+from agents.simulation_agent import simulate_decision
 
 # Import memory
 from llm.memory import load_memory, save_memory, format_memory_for_llm
-
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+from llm.scheduler import RequestScheduler, BATCH
+from llm import run_journal
+
+# Initialize Groq client — retries are left to the scheduler, which backs
+# off with jitter and counts them
+client = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+
+# Every LLM call goes through the scheduler so runs stay inside the
+# provider's rate limits — per process, so run concurrent sessions from one
+# process (one dashboard server, or run_products) to share the budget
+scheduler = RequestScheduler(
+    client,
+    requests_per_minute=int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+    tokens_per_minute=int(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000"))
+)
 
 # Global product selection — set by dashboard
 selected_product = None
@@ -25,6 +39,14 @@ def set_product(product):
     global selected_product
     selected_product = product
 
+# Client mode — when set, tools run on the long-lived inference service
+# (api/api.py) instead of loading the agents in-process
+inference_url = os.getenv("INFERENCE_SERVICE_URL")
+
+def set_inference_url(url):
+    global inference_url
+    inference_url = url
+
 # ─────────────────────────────────────────
 # TOOL DEFINITIONS — what LLM can call
 # ─────────────────────────────────────────
@@ -34,7 +56,7 @@ tools = [
         "type": "function",
         "function": {
             "name": "predict_demand",
-            "description": "Predicts future product demand using LSTM model based on historical sales data",
+            "description": "Predicts future demand for the selected product using its LSTM model based on historical sales data",
             "parameters": {
                 "type": "object",
                 "properties": {},
@@ -92,6 +114,27 @@ tools = [
                 "required": ["supplier_name"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "simulate_reorder_options",
+            "description": "Runs a Monte Carlo simulation over candidate reorder quantities and every supplier for the selected product, sampling demand, lead time and delivery delays, and returns the expected cost and service level of the best options",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "predicted_demand": {
+                        "type": "integer",
+                        "description": "The predicted demand value from the demand agent"
+                    },
+                    "reorder_qty": {
+                        "type": "integer",
+                        "description": "The reorder quantity from calculate_reorder, used to build the candidate quantities"
+                    }
+                },
+                "required": ["predicted_demand", "reorder_qty"]
+            }
+        }
     }
 ]
 
@@ -100,10 +143,24 @@ tools = [
 # TOOL EXECUTION — runs the actual agent
 # ─────────────────────────────────────────
 
+def execute_remote_tool(tool_name, tool_args):
+
+    response = requests.post(
+        f"{inference_url.rstrip('/')}/tools/{tool_name}",
+        json={"args": tool_args, "product": selected_product},
+        timeout=60
+    )
+    response.raise_for_status()
+    return response.json()
+
+
 def execute_tool(tool_name, tool_args):
 
+    if inference_url:
+        return execute_remote_tool(tool_name, tool_args)
+
     if tool_name == "predict_demand":
-        result = predict_demand_lstm()
+        result = predict_demand_lstm(selected_product)
         return {"demand": result}
 
     elif tool_name == "calculate_reorder":
@@ -121,6 +178,13 @@ def execute_tool(tool_name, tool_args):
         updated_reliability = update_reliability(supplier_name)
         return {"updated_reliability": updated_reliability}
 
+    elif tool_name == "simulate_reorder_options":
+        return simulate_decision(
+            product=selected_product,
+            reorder_qty=tool_args.get("reorder_qty"),
+            predicted_demand=tool_args.get("predicted_demand")
+        )
+
     else:
         return {"error": f"Unknown tool: {tool_name}"}
 
@@ -129,7 +193,7 @@ def execute_tool(tool_name, tool_args):
 # MAIN LLM AGENT LOOP — Level 3 + Memory
 # ─────────────────────────────────────────
 
-def run_llm_agent(product=None):
+def run_llm_agent(product=None, priority=BATCH, run_id=None):
 
     # Set selected product globally
     if product:
@@ -140,8 +204,8 @@ def run_llm_agent(product=None):
 
     # Load memory from previous runs
     memory = load_memory()
-    memory_text = format_memory_for_llm(memory)
-    print(f"Memory loaded: {len(memory)} previous runs found")
+    memory_text = format_memory_for_llm(selected_product)
+    print(f"Memory loaded: {len(memory)} recent runs found")
 
     messages = [
         {
@@ -165,6 +229,7 @@ Follow this process:
 3. Then select the best supplier using select_best_supplier tool
 4. Then update supplier reliability using update_supplier_reliability tool
 5. If supplier reliability is below 0.6, call calculate_reorder and select_best_supplier again
+   (you may also call simulate_reorder_options to compare stockout risk and cost across reorder quantities and suppliers)
 6. Finally provide a clear professional summary of all decisions made for {selected_product or 'the product'}, compare with previous runs if available, and explain any trends you notice
 
 You must call the tools yourself. Think step by step. Be autonomous.
@@ -185,88 +250,201 @@ Do NOT pass supplier_reliability to calculate_reorder."""
         "reasoning": []
     }
 
-    max_iterations = 10
-    iteration = 0
+    checkpoint = {
+        "run_id": run_id or run_journal.new_run_id(selected_product),
+        "product": selected_product,
+        "status": run_journal.RUNNING,
+        "iteration": 0,
+        "state": state,
+        "messages": messages,
+        "error": None
+    }
+    run_journal.save_checkpoint(checkpoint)
+    print(f"Run journal: {checkpoint['run_id']}")
 
-    while iteration < max_iterations:
+    return run_from_checkpoint(checkpoint, priority)
 
-        iteration += 1
-        print(f"--- LLM Thinking (iteration {iteration}) ---")
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-            max_tokens=1000,
-            temperature=0.1
-        )
+def resume_llm_agent(run_id, priority=BATCH):
+    """Continue a run from its last checkpoint instead of starting over"""
+
+    checkpoint = run_journal.load_checkpoint(run_id)
+    if checkpoint is None:
+        raise ValueError(f"No checkpoint found for run {run_id}")
+
+    if checkpoint["status"] == run_journal.COMPLETED:
+        return checkpoint["state"], checkpoint["messages"]
+
+    set_product(checkpoint["product"])
+
+    print(f"\n=== Resuming LLM Agent run {run_id} "
+          f"from iteration {checkpoint['iteration']} ===\n")
+
+    return run_from_checkpoint(checkpoint, priority)
 
-        message = response.choices[0].message
-
-        messages.append({
-            "role": "assistant",
-            "content": message.content or "",
-            "tool_calls": [
-                {
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments
-                    }
-                }
-                for tc in (message.tool_calls or [])
-            ] or None
-        })
-
-        if not message.tool_calls:
-            print("\n=== LLM Final Decision ===")
-            print(message.content)
-            state["reasoning"].append(message.content)
-            break
 
-        for tool_call in message.tool_calls:
+def update_state(state, tool_result):
 
-            tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments)
+    if "demand" in tool_result:
+        state["demand"] = tool_result["demand"]
+    if "reorder_qty" in tool_result:
+        state["reorder"] = tool_result["reorder_qty"]
+    if "supplier" in tool_result:
+        state["supplier"] = tool_result["supplier"]
+    if "reliability" in tool_result:
+        state["reliability"] = tool_result["reliability"]
+    if "updated_reliability" in tool_result:
+        state["reliability"] = tool_result["updated_reliability"]
 
-            print(f"LLM calling tool: {tool_name} with args: {tool_args}")
 
-            tool_result = execute_tool(tool_name, tool_args)
+def run_tool_call(checkpoint, tool_call):
+    """Run one tool call and journal its result. Answered calls are never
+    re-run — pending_tool_calls skips them on resume"""
 
-            print(f"Tool result: {tool_result}")
+    tool_name = tool_call["function"]["name"]
+    tool_args = json.loads(tool_call["function"]["arguments"] or "{}")
 
-            if "demand" in tool_result:
-                state["demand"] = tool_result["demand"]
-            if "reorder_qty" in tool_result:
-                state["reorder"] = tool_result["reorder_qty"]
-            if "supplier" in tool_result:
-                state["supplier"] = tool_result["supplier"]
-            if "reliability" in tool_result:
-                state["reliability"] = tool_result["reliability"]
-            if "updated_reliability" in tool_result:
-                state["reliability"] = tool_result["updated_reliability"]
+    print(f"LLM calling tool: {tool_name} with args: {tool_args}")
+    tool_result = execute_tool(tool_name, tool_args)
+
+    print(f"Tool result: {tool_result}")
+
+    update_state(checkpoint["state"], tool_result)
+
+    checkpoint["messages"].append({
+        "role": "tool",
+        "tool_call_id": tool_call["id"],
+        "content": json.dumps(tool_result)
+    })
+
+    run_journal.save_checkpoint(checkpoint)
+
+
+def pending_tool_calls(messages):
+    """Tool calls of the last assistant message that have no result yet"""
+
+    answered = {m["tool_call_id"] for m in messages if m.get("role") == "tool"}
+
+    for message in reversed(messages):
+        if message.get("role") == "assistant":
+            return [
+                tc for tc in (message.get("tool_calls") or [])
+                if tc["id"] not in answered
+            ]
+
+    return []
+
+
+def run_from_checkpoint(checkpoint, priority=BATCH):
+
+    state = checkpoint["state"]
+    messages = checkpoint["messages"]
+
+    max_iterations = 10
+
+    checkpoint["status"] = run_journal.RUNNING
+    checkpoint["error"] = None
+
+    try:
+        # Finish tool calls that were interrupted before the last checkpoint
+        for tool_call in pending_tool_calls(messages):
+            run_tool_call(checkpoint, tool_call)
+
+        while checkpoint["iteration"] < max_iterations:
+
+            iteration = checkpoint["iteration"] + 1
+            print(f"--- LLM Thinking (iteration {iteration}) ---")
+
+            response = scheduler.create(
+                priority=priority,
+                model="llama-3.3-70b-versatile",
+                messages=messages,
+                tools=tools,
+                tool_choice="auto",
+                max_tokens=1000,
+                temperature=0.1
+            )
+
+            message = response.choices[0].message
 
             messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call.id,
-                "content": json.dumps(tool_result)
+                "role": "assistant",
+                "content": message.content or "",
+                "tool_calls": [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.function.name,
+                            "arguments": tc.function.arguments
+                        }
+                    }
+                    for tc in (message.tool_calls or [])
+                ] or None
             })
 
+            checkpoint["iteration"] = iteration
+            run_journal.save_checkpoint(checkpoint)
+
+            if not message.tool_calls:
+                print("\n=== LLM Final Decision ===")
+                print(message.content)
+                state["reasoning"].append(message.content)
+                break
+
+            for tool_call in messages[-1]["tool_calls"]:
+                run_tool_call(checkpoint, tool_call)
+
+    except Exception as e:
+        checkpoint["status"] = run_journal.FAILED
+        checkpoint["error"] = str(e)
+        run_journal.save_checkpoint(checkpoint)
+        print(f"⚠ Run {checkpoint['run_id']} failed — resume with resume_llm_agent: {e}")
+        raise
+
     # Save this run to memory
     if state["demand"] and state["reorder"] and state["supplier"]:
         save_memory(
             state["demand"],
             state["reorder"],
             state["supplier"],
-            state["reliability"]
+            state["reliability"],
+            product=state["product"]
         )
         print("Memory saved for this run")
 
+    checkpoint["status"] = run_journal.COMPLETED
+    run_journal.save_checkpoint(checkpoint)
+
     return state, messages
 
 
+# ─────────────────────────────────────────
+# BATCH RUNS — resume what failed last time
+# ─────────────────────────────────────────
+
+def run_products(products, priority=BATCH):
+    """Run the agent for many products, resuming each product's unfinished
+    run from its checkpoint rather than starting over"""
+
+    results = {}
+
+    for product in products:
+        unfinished = run_journal.latest_unfinished_run(product)
+
+        try:
+            if unfinished:
+                state, _ = resume_llm_agent(unfinished["run_id"], priority)
+            else:
+                state, _ = run_llm_agent(product, priority)
+            results[product] = state
+        except Exception as e:
+            print(f"⚠ {product} failed: {e}")
+            results[product] = None
+
+    return results
+
+
 # ─────────────────────────────────────────
 # SIMPLE WRAPPER — for dashboard/app.py
 # ─────────────────────────────────────────
@@ -1,9 +1,28 @@
 import os
 import json
+import math
 from datetime import datetime
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MEMORY_PATH = os.path.join(BASE_DIR, "data", "memory.json")
+STATS_PATH = os.path.join(BASE_DIR, "data", "memory_stats.json")
+
+# Smoothing for the demand and reliability level/trend (Holt's method)
+LEVEL_ALPHA = 0.3
+TREND_BETA = 0.3
+
+# How many alternative suppliers the prompt block lists
+TOP_SUPPLIERS = 3
+
+DEFAULT_PRODUCT = "default"
+
+# Runs saved before memory was kept per product (entries without a
+# "product" field) — the only history a product without runs can borrow
+LEGACY_PRODUCT = "legacy"
+
+
+def product_key(product=None):
+    return str(product).lower() if product else DEFAULT_PRODUCT
 
 
 def load_memory():
@@ -18,13 +37,103 @@ def load_memory():
         return []
 
 
-def save_memory(demand, reorder, supplier, reliability):
+def load_memory_stats():
+    """Load per-product trend aggregates, rebuilding them from memory.json
+    the first time (for memory written before aggregates existed)"""
+    if os.path.exists(STATS_PATH):
+        try:
+            with open(STATS_PATH, "r") as f:
+                return json.load(f)
+        except:
+            pass
+
+    stats = {}
+    for entry in load_memory():
+        update_stats(stats, entry)
+    return stats
+
+
+def save_memory_stats(stats):
+    with open(STATS_PATH, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+# -----------------------------
+# O(1) Aggregate Updates
+# -----------------------------
+def update_holt(agg, value):
+    """Exponentially smoothed level and per-run trend"""
+    if agg["level"] is None:
+        agg["level"] = value
+        agg["trend"] = 0.0
+        return
+
+    previous = agg["level"]
+    agg["level"] = LEVEL_ALPHA * value + (1 - LEVEL_ALPHA) * (previous + agg["trend"])
+    agg["trend"] = TREND_BETA * (agg["level"] - previous) + (1 - TREND_BETA) * agg["trend"]
+
+
+def update_welford(agg, value):
+    """Running mean and variance"""
+    agg["count"] += 1
+    delta = value - agg["mean"]
+    agg["mean"] += delta / agg["count"]
+    agg["m2"] += delta * (value - agg["mean"])
+
+
+def new_product_stats():
+    return {
+        "runs": 0,
+        "first_run": None,
+        "last_run": None,
+        "demand": {"last": None, "level": None, "trend": 0.0},
+        "reorder": {"last": None, "count": 0, "mean": 0.0, "m2": 0.0},
+        "suppliers": {"counts": {}, "last": None, "streak": 0},
+        "reliability": {"last": None, "low": None, "level": None, "trend": 0.0}
+    }
+
+
+def update_stats(stats, entry):
+    """Fold one run into its product's aggregates in constant time"""
+    key = product_key(entry["product"]) if "product" in entry else LEGACY_PRODUCT
+    agg = stats.setdefault(key, new_product_stats())
+
+    agg["runs"] += 1
+    agg["first_run"] = agg["first_run"] or entry["timestamp"]
+    agg["last_run"] = entry["timestamp"]
+
+    if entry.get("demand") is not None:
+        agg["demand"]["last"] = entry["demand"]
+        update_holt(agg["demand"], entry["demand"])
+
+    if entry.get("reorder") is not None:
+        agg["reorder"]["last"] = entry["reorder"]
+        update_welford(agg["reorder"], entry["reorder"])
+
+    supplier = entry.get("supplier")
+    if supplier:
+        suppliers = agg["suppliers"]
+        suppliers["counts"][supplier] = suppliers["counts"].get(supplier, 0) + 1
+        suppliers["streak"] = suppliers["streak"] + 1 if supplier == suppliers["last"] else 1
+        suppliers["last"] = supplier
+
+    reliability = entry.get("reliability")
+    if reliability is not None:
+        rel = agg["reliability"]
+        rel["last"] = reliability
+        rel["low"] = reliability if rel["low"] is None else min(rel["low"], reliability)
+        update_holt(rel, reliability)
+
+
+def save_memory(demand, reorder, supplier, reliability, product=None):
     """Save current decision to memory file"""
     memory = load_memory()
+    stats = load_memory_stats()
 
     # Add new entry
     entry = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "product": product,
         "demand": demand,
         "reorder": reorder,
         "supplier": supplier,
@@ -39,20 +148,76 @@ def save_memory(demand, reorder, supplier, reliability):
     with open(MEMORY_PATH, "w") as f:
         json.dump(memory, f, indent=2)
 
+    # Aggregates cover every run, not just the last 10
+    update_stats(stats, entry)
+    save_memory_stats(stats)
+
+
+# -----------------------------
+# Prompt Block
+# -----------------------------
+def direction(trend, level, tolerance=0.002):
+    if not level or abs(trend) <= abs(level) * tolerance:
+        return "stable"
+    return "rising" if trend > 0 else "falling"
+
+
+def format_memory_for_llm(product=None):
+    """Format the product's trend aggregates into a fixed-size prompt block.
+
+    The block is the same size after 2 runs or 2000, so memory context
+    doesn't grow with history.
+    """
+    stats = load_memory_stats()
+    agg = stats.get(product_key(product))
+    label = product or "the default product"
+
+    # Without runs of its own, a product can only borrow the untagged
+    # history from before memory was kept per product — never another
+    # product's runs
+    if not agg or not agg["runs"]:
+        agg = stats.get(LEGACY_PRODUCT)
+        label = "earlier runs not tagged with a product"
 
-def format_memory_for_llm(memory):
-    """Format memory into readable text for LLM prompt"""
-    if not memory:
+    if not agg or not agg["runs"]:
         return "No previous decisions available. This is the first run."
 
-    lines = ["Previous supply chain decisions (most recent last):"]
-    for i, entry in enumerate(memory[-5:], 1):
+    lines = [
+        f"Trends over {agg['runs']} previous runs for {label} "
+        f"({agg['first_run']} to {agg['last_run']}):"
+    ]
+
+    demand = agg["demand"]
+    if demand["level"] is not None:
+        lines.append(
+            f"- Demand: last {demand['last']}, moving average {demand['level']:.1f}, "
+            f"trend {demand['trend']:+.1f} per run ({direction(demand['trend'], demand['level'])})"
+        )
+
+    reorder = agg["reorder"]
+    if reorder["count"]:
+        std = math.sqrt(reorder["m2"] / (reorder["count"] - 1)) if reorder["count"] > 1 else 0.0
+        lines.append(
+            f"- Reorder: last {reorder['last']}, mean {reorder['mean']:.1f}, std dev {std:.1f}"
+        )
+
+    suppliers = agg["suppliers"]
+    if suppliers["counts"]:
+        ranked = sorted(suppliers["counts"].items(), key=lambda item: -item[1])
+        total = sum(suppliers["counts"].values())
+        top, top_count = ranked[0]
+        others = ", ".join(f"{name} ({count})" for name, count in ranked[1:TOP_SUPPLIERS + 1])
+        lines.append(
+            f"- Supplier: {top} selected in {top_count}/{total} runs ({top_count / total:.0%}); "
+            f"last {suppliers['last']} for {suppliers['streak']} run(s) in a row"
+            + (f"; others: {others}" if others else "")
+        )
+
+    rel = agg["reliability"]
+    if rel["level"] is not None:
         lines.append(
-            f"Run {i} ({entry['timestamp']}): "
-            f"Demand={entry['demand']}, "
-            f"Reorder={entry['reorder']}, "
-            f"Supplier={entry['supplier']}, "
-            f"Reliability={entry['reliability']}"
+            f"- Reliability: last {rel['last']}, moving average {rel['level']:.2f}, "
+            f"low {rel['low']}, trend {rel['trend']:+.3f} per run ({direction(rel['trend'], rel['level'])})"
         )
 
     return "\n".join(lines)
\ No newline at end of file
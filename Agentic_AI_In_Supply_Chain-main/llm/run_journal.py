@@ -0,0 +1,103 @@
+import os
+import json
+import uuid
+from datetime import datetime
+
+from agents.demand_model_store import product_slug
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS_DIR = os.path.join(BASE_DIR, "data", "runs")
+
+RUNNING = "running"
+FAILED = "failed"
+COMPLETED = "completed"
+
+
+def new_run_id(product=None):
+    """Unique, time-ordered id for an agent run"""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return f"{stamp}-{product_slug(product or 'default')}-{uuid.uuid4().hex[:6]}"
+
+
+def run_path(run_id):
+    return os.path.join(RUNS_DIR, f"{run_id}.json")
+
+
+def save_checkpoint(checkpoint):
+    """Write a run's checkpoint atomically so a crash never leaves half a file"""
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    checkpoint["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    path = run_path(checkpoint["run_id"])
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(run_id):
+    """Load a run's last checkpoint, or None if it doesn't exist"""
+    path = run_path(run_id)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except:
+        return None
+
+
+def run_slug(run_id):
+    """Product slug embedded in a run id: <date>-<time>-<slug>-<suffix>"""
+    return run_id.split("-", 2)[-1].rsplit("-", 1)[0]
+
+
+def run_ids(product=None):
+    """Run ids in the journal, oldest first, without opening any file.
+
+    With a product, only the runs whose id carries its slug are listed."""
+    if not os.path.exists(RUNS_DIR):
+        return []
+
+    ids = [f[:-len(".json")] for f in sorted(os.listdir(RUNS_DIR)) if f.endswith(".json")]
+    if product is not None:
+        slug = product_slug(product)
+        ids = [run_id for run_id in ids if run_slug(run_id) == slug]
+    return ids
+
+
+def matches(checkpoint, product=None, status=None):
+    if product is not None and (checkpoint.get("product") or "").lower() != product.lower():
+        return False
+    if status is not None and checkpoint.get("status") != status:
+        return False
+    return True
+
+
+def list_runs(product=None, status=None):
+    """Checkpoints in the journal, oldest first"""
+    runs = []
+    for run_id in run_ids(product):
+        checkpoint = load_checkpoint(run_id)
+        if checkpoint is not None and matches(checkpoint, product, status):
+            runs.append(checkpoint)
+
+    return runs
+
+
+def latest_unfinished_run(product=None):
+    """Most recent run for the product that failed or was interrupted"""
+
+    # Ids are time-ordered, so walk back from the newest of this product's
+    # runs and stop at the first unfinished one
+    for run_id in reversed(run_ids(product or "default")):
+        checkpoint = load_checkpoint(run_id)
+        if checkpoint is None or not matches(checkpoint, product):
+            continue
+        if product is None and checkpoint.get("product") is not None:
+            continue
+        if checkpoint.get("status") in (RUNNING, FAILED):
+            return checkpoint
+
+    return None
@@ -0,0 +1,251 @@
+import time
+import random
+import asyncio
+import threading
+import itertools
+from queue import PriorityQueue
+from concurrent.futures import Future
+
+# Lower runs first — interactive dashboard runs overtake batch runs
+INTERACTIVE = 0
+BATCH = 1
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to `capacity`"""
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or rate_per_minute
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount=1):
+        """Take `amount` units and return 0, or return the seconds to wait"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def refund(self, amount):
+        """Give back over-estimated units (negative to charge extra)"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def estimate_tokens(kwargs):
+    """Rough prompt + completion token count of a chat completion request"""
+    chars = sum(len(str(m.get("content") or "")) for m in kwargs.get("messages", []))
+    chars += len(str(kwargs.get("tools") or ""))
+    return chars // 4 + kwargs.get("max_tokens", 0)
+
+
+def status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """Paces chat completion calls to stay inside provider rate limits.
+
+    Requests are queued by priority and sent by `concurrency` worker threads
+    once both the requests-per-minute and tokens-per-minute buckets allow
+    it. 429 and 5xx responses are retried with jittered exponential backoff
+    (or the provider's Retry-After). `client` is anything with
+    `chat.completions.create(**kwargs)`, so a fake client can stand in.
+
+    The buckets live in this process only. Sessions share a budget when
+    they share the scheduler — every Streamlit session of one dashboard
+    server, or every product of `run_products` — but separate processes
+    (a second dashboard, `python main.py` next to it) each get the full
+    budget, so give each its share of the quota via the constructor or
+    GROQ_REQUESTS_PER_MINUTE / GROQ_TOKENS_PER_MINUTE.
+    """
+
+    def __init__(
+        self,
+        client,
+        requests_per_minute=30,
+        tokens_per_minute=12000,
+        concurrency=4,
+        max_retries=5,
+        base_delay=1.0,
+        max_delay=30.0,
+        clock=time.monotonic,
+        sleep=time.sleep
+    ):
+        self.client = client
+        self.request_bucket = TokenBucket(requests_per_minute, clock=clock)
+        self.token_bucket = TokenBucket(tokens_per_minute, clock=clock)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+
+        self._queue = PriorityQueue()
+        # Counts queued jobs no worker has claimed yet
+        self._pending = threading.Semaphore(0)
+        self._sequence = itertools.count()
+        self._workers = []
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "throttled": 0,
+            "throttle_seconds": 0.0,
+            "queue_wait_seconds": 0.0,
+            "in_flight": 0
+        }
+        self._queued = {INTERACTIVE: 0, BATCH: 0}
+
+    # -----------------------------
+    # Submitting Requests
+    # -----------------------------
+    def submit(self, priority=BATCH, **kwargs):
+        """Queue a chat completion and return a Future for its response"""
+        self._start_workers()
+
+        future = Future()
+        with self._lock:
+            self.metrics["submitted"] += 1
+            self._queued[priority] = self._queued.get(priority, 0) + 1
+
+        self._queue.put((priority, next(self._sequence), self.clock(), kwargs, future))
+        self._pending.release()
+        return future
+
+    def create(self, priority=BATCH, **kwargs):
+        """Blocking call with the same arguments as chat.completions.create"""
+        return self.submit(priority, **kwargs).result()
+
+    async def acreate(self, priority=BATCH, **kwargs):
+        """Awaitable version of create for concurrent orchestrators"""
+        return await asyncio.wrap_future(self.submit(priority, **kwargs))
+
+    # -----------------------------
+    # Workers
+    # -----------------------------
+    def _start_workers(self):
+        with self._lock:
+            while len(self._workers) < self.concurrency:
+                worker = threading.Thread(target=self._work, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _wait_for(self, bucket, amount):
+        while True:
+            wait = bucket.try_acquire(amount)
+            if wait == 0:
+                return
+            with self._lock:
+                self.metrics["throttled"] += 1
+                self.metrics["throttle_seconds"] += wait
+            self.sleep(wait)
+
+    def _work(self):
+        while True:
+            # Claim a job, wait for a request slot, and only then pick the
+            # job — so whichever has the highest priority once capacity frees
+            # up goes next, rather than whatever was queued when we woke up
+            self._pending.acquire()
+            self._wait_for(self.request_bucket, 1)
+
+            priority, _, enqueued, kwargs, future = self._queue.get()
+
+            with self._lock:
+                self._queued[priority] -= 1
+                self.metrics["queue_wait_seconds"] += self.clock() - enqueued
+                self.metrics["in_flight"] += 1
+
+            try:
+                future.set_result(self._send(kwargs))
+                outcome = "completed"
+            except Exception as e:
+                future.set_exception(e)
+                outcome = "failed"
+
+            with self._lock:
+                self.metrics["in_flight"] -= 1
+                self.metrics[outcome] += 1
+
+    def _send(self, kwargs):
+        estimate = estimate_tokens(kwargs)
+        attempt = 0
+
+        while True:
+            # The first attempt's request slot was taken before picking the job
+            if attempt > 0:
+                self._wait_for(self.request_bucket, 1)
+            self._wait_for(self.token_bucket, estimate)
+
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                status = status_code(e)
+                if status not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    raise
+
+                attempt += 1
+                delay = retry_after(e)
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                    delay = random.uniform(0, delay)
+
+                with self._lock:
+                    self.metrics["retries"] += 1
+                    if status == 429:
+                        self.metrics["rate_limited"] += 1
+
+                print(f"LLM request failed with {status}, retrying in {delay:.1f}s "
+                      f"(attempt {attempt}/{self.max_retries})")
+                self.sleep(delay)
+                continue
+
+            # Correct the bucket with the real token usage when reported
+            usage = getattr(response, "usage", None)
+            total = getattr(usage, "total_tokens", None)
+            if isinstance(total, (int, float)):
+                self.token_bucket.refund(estimate - total)
+
+            return response
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats(self):
+        with self._lock:
+            return {
+                **self.metrics,
+                "queue_depth": self._queue.qsize(),
+                "queued_interactive": self._queued.get(INTERACTIVE, 0),
+                "queued_batch": self._queued.get(BATCH, 0)
+            }
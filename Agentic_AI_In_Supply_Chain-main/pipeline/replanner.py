@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from agents.advanced_demand_agent import predict_demand_lstm, model_store
+from agents.inventory_agent import inventory_decisions
+from agents.supplier_agent import select_suppliers
+from agents.feedback_agent import apply_performance
+from storage.table_store import read_table, table_columns
+
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DECISIONS_PATH = os.path.join(DATA_DIR, "decisions.json")
+
+# -----------------------------
+# Dependency Graph
+# -----------------------------
+# Data file -> pipeline stage that reads it
+FILE_STAGES = {
+    "sales.csv": "demand",
+    "inventory.csv": "reorder",
+    "performance.csv": "reliability",
+    "suppliers.csv": "supplier"
+}
+
+# Files with a product column, so a change can be narrowed to some products
+PRODUCT_KEYED_FILES = ["sales.csv", "inventory.csv"]
+
+# Stage -> stages that consume its output. Reliability only feeds the
+# reorder stage through product-level delivery history, so detect_changes
+# adds that edge for the products new performance records name
+DOWNSTREAM = {
+    "demand": ["reorder"],
+    "reorder": ["supplier"],
+    "reliability": ["supplier"],
+    "supplier": []
+}
+
+STAGES = ["demand", "reorder", "reliability", "supplier"]
+
+
+# -----------------------------
+# Persisted Decisions
+# -----------------------------
+def load_decisions():
+    """Load refreshed decisions and the watcher's view of data/"""
+    if not os.path.exists(DECISIONS_PATH):
+        return {"products": {}, "state": {}}
+
+    try:
+        with open(DECISIONS_PATH, "r") as f:
+            return json.load(f)
+    except:
+        return {"products": {}, "state": {}}
+
+
+def save_decisions(decisions):
+    # Written atomically — a corrupt file would reset performance_rows and
+    # silently drop records that were never applied
+    tmp_path = DECISIONS_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(decisions, f, indent=2)
+    os.replace(tmp_path, DECISIONS_PATH)
+
+
+# -----------------------------
+# Change Detection
+# -----------------------------
+def file_signature(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def product_digests(path):
+    """Hash of each product's rows, or None if the file isn't product keyed"""
+    df = pd.read_csv(path)
+    if "product" not in df.columns:
+        return None
+
+    digests = {}
+    for product, rows in df.groupby(df["product"].astype(str).str.lower()):
+        digests[product] = hashlib.md5(rows.to_csv(index=False).encode("utf-8")).hexdigest()
+    return digests
+
+
+def changed_products(old, new, products):
+    if old is None or new is None:
+        return list(products)
+    return [p for p in products if old.get(p.lower()) != new.get(p.lower())]
+
+
+def detect_changes(state, products):
+    """Stages invalidated directly by changed data files, per product.
+
+    Also returns the performance records appended since the last pass.
+    """
+    signatures = state.setdefault("signatures", {})
+    digests = state.setdefault("digests", {})
+
+    invalid = {product: set() for product in products}
+    new_performance = None
+
+    for filename, stage in FILE_STAGES.items():
+
+        path = os.path.join(DATA_DIR, filename)
+        signature = file_signature(path)
+
+        if signature == signatures.get(filename):
+            continue
+        signatures[filename] = signature
+
+        if signature is None:
+            continue
+
+        if filename in PRODUCT_KEYED_FILES:
+            new_digests = product_digests(path)
+            affected = changed_products(digests.get(filename), new_digests, products)
+            digests[filename] = new_digests
+
+        elif filename == "performance.csv":
+            keyed = "product" in table_columns("performance")
+            perf = read_table(
+                "performance",
+                ["supplier", "delivery_delay", "quality_issue"] + (["product"] if keyed else [])
+            )
+            applied = state.get("performance_rows")
+
+            # Records already on disk when the watcher first starts (or after
+            # the file is rewritten) are the baseline and aren't re-applied
+            if applied is None or applied > len(perf):
+                applied = len(perf)
+
+            state["performance_rows"] = len(perf)
+
+            if applied == len(perf):
+                continue
+
+            new_performance = perf.iloc[applied:]
+            affected = products
+
+            # Product-level delivery history feeds the reorder model
+            if keyed:
+                named = set(new_performance["product"].astype(str).str.lower())
+                for product in products:
+                    if product.lower() in named:
+                        invalid[product].add("reorder")
+
+        else:
+            affected = products
+
+        for product in affected:
+            invalid[product].add(stage)
+
+    return invalid, new_performance
+
+
+def invalidate(stages):
+    """Close a set of stages over their downstream dependents"""
+    pending = list(stages)
+    closed = set(stages)
+
+    while pending:
+        for dependent in DOWNSTREAM[pending.pop()]:
+            if dependent not in closed:
+                closed.add(dependent)
+                pending.append(dependent)
+
+    return closed
+
+
+# -----------------------------
+# Incremental Re-planning
+# -----------------------------
+def replan_once():
+    """Re-run only the stages invalidated since the last pass and persist
+    the refreshed decisions. Returns {product: stages re-run}."""
+
+    decisions = load_decisions()
+    state = decisions.setdefault("state", {})
+    results = decisions.setdefault("products", {})
+
+    products = read_table("inventory", ["product"])["product"].astype(str).tolist()
+
+    invalid, new_performance = detect_changes(state, products)
+
+    # Stages a failed pass never finished
+    pending = state.get("pending", {})
+
+    plan = {}
+    for product in products:
+        # Products without a complete previous decision run the whole pipeline
+        previous = results.get(product, {})
+        if all(key in previous for key in ("demand", "reorder", "supplier")):
+            stages = invalid[product] | set(pending.get(product, []))
+        else:
+            stages = set(STAGES)
+        stages = invalidate(stages)
+        if stages:
+            plan[product] = stages
+
+    if not plan:
+        save_decisions(decisions)
+        return {}
+
+    print(f"Re-planning {len(plan)} product(s): "
+          + ", ".join(f"{p} [{', '.join(s for s in STAGES if s in plan[p])}]" for p in plan))
+
+    state["pending"] = {product: [s for s in STAGES if s in stages] for product, stages in plan.items()}
+
+    # Stage: demand — products sharing a model reload it only once
+    demand_products = [p for p, stages in plan.items() if "demand" in stages]
+    for key in {model_store.key_for(p) for p in demand_products}:
+        model_store.evict_key(key)
+    for product in demand_products:
+        results.setdefault(product, {})["demand"] = predict_demand_lstm(product)
+
+    # Stage: reorder — one batched model call
+    reorder_products = [p for p, stages in plan.items() if "reorder" in stages]
+    if reorder_products:
+        reorders = inventory_decisions([
+            (results[p]["demand"], None, p) for p in reorder_products
+        ])
+        for product, (_, reorder) in zip(reorder_products, reorders):
+            results[product]["reorder"] = reorder
+
+    # Stage: reliability — only the newly appended performance records
+    if new_performance is not None:
+        apply_performance(new_performance)
+        # Our own write to suppliers.csv shouldn't trigger another pass
+        state["signatures"]["suppliers.csv"] = file_signature(
+            os.path.join(DATA_DIR, "suppliers.csv")
+        )
+        # Persist right away so a failure in a later stage can't re-apply
+        # these records; the stages still pending are re-run next pass
+        save_decisions(decisions)
+
+    # Stage: supplier — suppliers are scored once for every product
+    supplier_products = [p for p, stages in plan.items() if "supplier" in stages]
+    if supplier_products:
+        selections = select_suppliers([results[p]["reorder"] for p in supplier_products])
+        for product, (supplier, reliability, _) in zip(supplier_products, selections):
+            results[product]["supplier"] = supplier
+            results[product]["reliability"] = reliability
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for product, stages in plan.items():
+        results[product]["updated_at"] = timestamp
+        results[product]["refreshed"] = [s for s in STAGES if s in stages]
+
+    state["pending"] = {}
+    save_decisions(decisions)
+
+    return {product: [s for s in STAGES if s in stages] for product, stages in plan.items()}
+
+
+def watch(interval=2.0):
+    """Poll data/ and re-plan whenever a file changes"""
+    print(f"Watching {DATA_DIR} (every {interval}s)...")
+
+    while True:
+        try:
+            replan_once()
+        except Exception as e:
+            print("⚠ Re-planning failed:", e)
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    watch()
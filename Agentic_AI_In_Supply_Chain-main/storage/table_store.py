@@ -0,0 +1,178 @@
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+COLUMNAR_DIR = os.path.join(DATA_DIR, "columnar")
+
+# Rows per record batch — the unit of chunked streaming
+CHUNK_ROWS = 65536
+
+# The CSV stays the source of truth; its signature is stored with the
+# columnar copy so an edited CSV is re-converted on the next read
+SOURCE_KEY = b"source_signature"
+
+# One lock per table so concurrent readers convert a stale table only once
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+# -----------------------------
+# Compact dtypes
+# -----------------------------
+def compact(df):
+    """Downcast numeric columns and turn string columns into categoricals"""
+    df = df.copy()
+
+    for column in df.columns:
+        values = df[column]
+
+        if pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+            df[column] = pd.to_numeric(values, downcast="integer")
+
+        elif pd.api.types.is_float_dtype(values):
+            # Only when lossless — reliability thresholds compare against
+            # values like 0.6 that float32 can't represent exactly
+            as_float32 = values.astype(np.float32)
+            if (as_float32.astype(np.float64) == values).all():
+                df[column] = as_float32
+
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            df[column] = values.astype("category")
+
+    return df
+
+
+# -----------------------------
+# Conversion
+# -----------------------------
+def csv_path(name):
+    return os.path.join(DATA_DIR, f"{name}.csv")
+
+
+def table_path(name):
+    return os.path.join(COLUMNAR_DIR, f"{name}.arrow")
+
+
+def source_signature(name):
+    stat = os.stat(csv_path(name))
+    return f"{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")
+
+
+def table_lock(name):
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def convert(name):
+    """Write data/<name>.csv as an uncompressed Arrow IPC file that can be
+    memory-mapped, in record batches of CHUNK_ROWS"""
+    if not os.path.exists(csv_path(name)):
+        raise FileNotFoundError(f"{name}.csv not found in data folder.")
+
+    os.makedirs(COLUMNAR_DIR, exist_ok=True)
+
+    signature = source_signature(name)
+    table = pa.Table.from_pandas(compact(pd.read_csv(csv_path(name))), preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        SOURCE_KEY: signature
+    })
+
+    # A unique temp file, so a concurrent conversion never writes into ours
+    fd, tmp_path = tempfile.mkstemp(dir=COLUMNAR_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+                    writer.write_batch(batch)
+        os.replace(tmp_path, table_path(name))
+    except:
+        os.remove(tmp_path)
+        raise
+
+
+def convert_all():
+    for filename in sorted(os.listdir(DATA_DIR)):
+        if filename.endswith(".csv"):
+            name = filename[:-len(".csv")]
+            with table_lock(name):
+                convert(name)
+
+
+def is_current(name):
+    path = table_path(name)
+    if not os.path.exists(path):
+        return False
+
+    with pa.memory_map(path, "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return metadata.get(SOURCE_KEY) == source_signature(name)
+
+
+def ensure_table(name):
+    """Convert the CSV if its columnar copy is missing or out of date"""
+    if is_current(name):
+        return table_path(name)
+
+    with table_lock(name):
+        # Another thread may have converted it while we waited
+        if not is_current(name):
+            convert(name)
+
+    return table_path(name)
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def table_columns(name):
+    with pa.memory_map(ensure_table(name), "r") as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def table_rows(name):
+    """Row count from the record batch headers, without reading any data"""
+    with pa.memory_map(ensure_table(name), "r") as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def read_table(name, columns=None, start=0, stop=None):
+    """Load only the requested columns and rows [start, stop) of a table.
+
+    The file is memory-mapped, so columns and rows outside the projection
+    are never read from disk.
+    """
+    with pa.memory_map(ensure_table(name), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+
+        if columns is not None:
+            table = table.select(list(columns))
+
+        stop = table.num_rows if stop is None else min(stop, table.num_rows)
+        table = table.slice(start, max(stop - start, 0))
+
+        return table.to_pandas()
+
+
+def iter_table(name, columns=None):
+    """Stream a table one record batch (CHUNK_ROWS rows) at a time"""
+    with pa.memory_map(ensure_table(name), "r") as source:
+        reader = pa.ipc.open_file(source)
+
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(list(columns))
+            yield batch.to_pandas()
+
+
+if __name__ == "__main__":
+    convert_all()
+    print(f"Converted data/*.csv to {COLUMNAR_DIR}")